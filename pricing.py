@@ -0,0 +1,20 @@
+"""
+ComEd Price Levels
+Shared price thresholds and indicators for the controller and the API test script.
+"""
+
+import bisect
+
+# Inclusive upper bound of each price level in cents/kWh; anything above the last is VERY HIGH
+THRESHOLDS = (3.0, 5.0, 8.0, 12.0)
+INDICATORS = ("💚 EXCELLENT", "🟢 GOOD", "🟡 MODERATE", "🟠 HIGH", "🔴 VERY HIGH")
+
+
+def price_level(price: float) -> int:
+    """Return the price level index for a price in cents/kWh (0 = excellent, 4 = very high)."""
+    return bisect.bisect_left(THRESHOLDS, price)
+
+
+def price_indicator(price: float) -> str:
+    """Return the visual indicator for a price in cents/kWh."""
+    return INDICATORS[price_level(price)]
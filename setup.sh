@@ -107,7 +107,7 @@ echo "Step 3: Testing ComEd API..."
 echo ""
 
 if command -v python3 &> /dev/null; then
-    pip3 install -q requests 2>/dev/null || true
+    pip3 install -q requests numpy 2>/dev/null || true
     python3 test_comed_api.py
 else
     print_warning "Python3 not found - skipping API test"
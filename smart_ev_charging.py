@@ -5,16 +5,32 @@ Sends SMS notifications for charging decisions.
 """
 
 import os
-import time
-import json
+import asyncio
 import logging
+import smtplib
+import sys
 from datetime import datetime
-from typing import Optional, Dict, Any
+from email.mime.text import MIMEText
+from typing import Optional, Dict, Any, Callable, Tuple, Literal
 
-import requests
+import httpx
 import paho.mqtt.client as mqtt
 from dotenv import load_dotenv
 
+# orjson parses bytes directly and is much faster; stdlib json is the fallback
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# CBOR telemetry payloads are optional and need cbor2
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+from pricing import price_indicator
+
 # Email to SMS notification (assuming you have this module)
 # from email_to_sms_notifier import EmailToSMSNotifier
 
@@ -45,19 +61,20 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': '🚨',
     }
     
-    def format(self, record):
-        # Get color and icon for log level
-        color = self.COLORS.get(record.levelname, '')
-        icon = self.ICONS.get(record.levelname, '')
+    def __init__(self):
+        super().__init__(datefmt='%Y-%m-%d %H:%M:%S')
         
-        # Format timestamp
-        timestamp = self.formatTime(record, '%Y-%m-%d %H:%M:%S')
-        
-        # Build formatted message
-        log_msg = f"{color}{icon} [{timestamp}] {record.levelname}{self.RESET}"
-        log_msg += f" | {record.getMessage()}"
-        
-        return log_msg
+        # Build each level's format string once instead of on every record
+        self._formats = {
+            level: f"{color}{self.ICONS[level]} [%(asctime)s] {level}{self.RESET} | %(message)s"
+            for level, color in self.COLORS.items()
+        }
+        self._default_format = f" [%(asctime)s] %(levelname)s{self.RESET} | %(message)s"
+    
+    def format(self, record):
+        # Select the prebuilt format for this level and let logging fill it in
+        self._style._fmt = self._formats.get(record.levelname, self._default_format)
+        return super().format(record)
 
 # Set up logger with colored formatter
 handler = logging.StreamHandler()
@@ -69,6 +86,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# httpx logs every request at INFO; keep per-cycle HTTP chatter out of the output
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+# Battery status line logged on every MQTT message
+_BATTERY_LOG_FMT = "%s Battery: %s%% | Range: %.1f mi | Temp: %s°F | %s %s"
+
+# Console separator lines, built once at import
+_EQ80 = "=" * 80
+_DASH80 = "\u2500" * 80
+_DOT80 = "\u2504" * 80
+
 
 class ComEdPriceChecker:
     """Fetches current hourly electricity pricing from ComEd API."""
@@ -76,8 +105,24 @@ class ComEdPriceChecker:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://hourlypricing.comed.com/api"
+        
+        # Persistent HTTP/2 client so each poll reuses the keep-alive connection
+        self.session = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=3.05),
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=8)
+        )
+        
+        # Validators from the last response, used for conditional requests
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._last_price: Optional[float] = None
     
-    def get_current_price(self) -> Optional[float]:
+    async def aclose(self):
+        """Close the underlying HTTP client."""
+        await self.session.aclose()
+    
+    async def get_current_price(self) -> Optional[float]:
         """
         Get current hourly price in cents per kWh.
         
@@ -87,121 +132,299 @@ class ComEdPriceChecker:
         try:
             # Get current price (5-minute intervals)
             url = f"{self.base_url}?type=5minutefeed"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+            headers = {}
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+            response = await self.session.get(url, headers=headers)
             
-            data = response.json()
+            # Feed unchanged since the last poll - reuse the cached price
+            if response.status_code == 304 and self._last_price is not None:
+                logger.info("💰 ComEd Price: %.2f¢/kWh | %s (unchanged)",
+                            self._last_price, price_indicator(self._last_price))
+                return self._last_price
             
-            # The API returns a list, get the most recent price
-            if data and len(data) > 0:
-                latest = data[0]
-                price = float(latest.get('price', 0))
-                
-                # Add visual indicators based on price
-                if price <= 3.0:
-                    indicator = "💚 EXCELLENT"
-                elif price <= 5.0:
-                    indicator = "🟢 GOOD"
-                elif price <= 8.0:
-                    indicator = "🟡 MODERATE"
-                elif price <= 12.0:
-                    indicator = "🟠 HIGH"
-                else:
-                    indicator = "🔴 VERY HIGH"
-                
-                logger.info(f"💰 ComEd Price: {price:.2f}¢/kWh | {indicator}")
-                return price
+            response.raise_for_status()
             
-            logger.warning("No pricing data returned from ComEd API")
-            return None
+            price = self._parse_price(response.json())
+            if price is not None:
+                self._etag = response.headers.get('ETag')
+                self._last_modified = response.headers.get('Last-Modified')
+                self._last_price = price
+            return price
             
-        except requests.RequestException as e:
-            logger.error(f"Error fetching ComEd price: {e}")
+        except httpx.HTTPError as e:
+            logger.error("Error fetching ComEd price: %s", e)
             return None
         except (ValueError, KeyError) as e:
-            logger.error(f"Error parsing ComEd response: {e}")
+            logger.error("Error parsing ComEd response: %s", e)
             return None
+    
+    def _parse_price(self, data) -> Optional[float]:
+        """Extract the most recent price from a 5-minute feed response."""
+        # The API returns a list, get the most recent price
+        if data and len(data) > 0:
+            latest = data[0]
+            price = float(latest.get('price', 0))
+            
+            logger.info("💰 ComEd Price: %.2f¢/kWh | %s", price, price_indicator(price))
+            return price
+        
+        logger.warning("No pricing data returned from ComEd API")
+        return None
 
 
-class EVBatteryMonitor:
-    """Monitors EV battery status via MQTT."""
+class MqttBus:
+    """Shares a single MQTT client across all topic handlers, driven by the asyncio event loop."""
     
-    def __init__(self, mqtt_host: str, mqtt_port: int, vehicle_vin: str):
+    # Seconds between loop_misc() calls (keepalive pings and timeouts)
+    MISC_INTERVAL = 1.0
+    # Reconnect backoff bounds in seconds; the delay doubles after each failed attempt
+    RECONNECT_MIN_DELAY = 1.0
+    RECONNECT_MAX_DELAY = 120.0
+    
+    def __init__(self, mqtt_host: str, mqtt_port: int):
         self.mqtt_host = mqtt_host
         self.mqtt_port = mqtt_port
-        self.vehicle_vin = vehicle_vin
-        self.battery_state: Dict[str, Any] = {}
         self.connected = False
         
+        # Bound to the running event loop in connect()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connected_event: Optional[asyncio.Event] = None
+        self._misc_handle: Optional[asyncio.TimerHandle] = None
+        self._reconnect_delay = self.RECONNECT_MIN_DELAY
+        self._reconnect_handle: Optional[asyncio.TimerHandle] = None
+        self._stopping = False
+        
+        # Topic filter -> (message callback, QoS)
+        self._handlers: Dict[str, Tuple[Callable[..., None], int]] = {}
+        
         # MQTT Client setup
         self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
+        
+        # Socket callbacks let the event loop do paho's network I/O instead of a loop thread
+        self.client.on_socket_open = self._on_socket_open
+        self.client.on_socket_close = self._on_socket_close
+        self.client.on_socket_register_write = self._on_socket_register_write
+        self.client.on_socket_unregister_write = self._on_socket_unregister_write
+    
+    def subscribe(self, topic: str, handler: Callable[..., None], qos: int = 0):
+        """
+        Route messages matching a topic filter to a handler.
+        
+        Args:
+            topic: MQTT topic filter, wildcards allowed
+            handler: Callback with paho's on_message signature (client, userdata, msg)
+            qos: Subscription QoS level
+        """
+        self._handlers[topic] = (handler, qos)
+        if self.connected:
+            self.client.subscribe(topic, qos)
+            logger.info(f"Subscribed to: {topic}")
+    
+    def publish(self, topic: str, payload: str, qos: int = 0, retain: bool = False) -> mqtt.MQTTMessageInfo:
+        """Publish a message on the shared client."""
+        return self.client.publish(topic, payload, qos=qos, retain=retain)
     
     def _on_connect(self, client, userdata, flags, reason_code, properties):
         """Callback when connected to MQTT broker."""
         self.connected = True
+        self._connected_event.set()
         logger.info(f"Connected to MQTT broker with result code: {reason_code}")
+        if not reason_code.is_failure:
+            self._reconnect_delay = self.RECONNECT_MIN_DELAY
         
-        # Subscribe to battery state topic
-        battery_topic = f"homeassistant/sensor/{self.vehicle_vin}/high_voltage_battery/state"
-        client.subscribe(battery_topic)
-        logger.info(f"Subscribed to: {battery_topic}")
+        # Subscribe to all registered topics in a single SUBSCRIBE packet
+        if self._handlers:
+            client.subscribe([(topic, qos) for topic, (_, qos) in self._handlers.items()])
+            for topic in self._handlers:
+                logger.info(f"Subscribed to: {topic}")
     
     def _on_disconnect(self, client, userdata, flags, reason_code, properties):
         """Callback when disconnected from MQTT broker."""
         self.connected = False
+        self._connected_event.clear()
+        # paho can report one drop more than once; a single retry chain is enough
+        if self._stopping or self._reconnect_handle is not None:
+            return
+        
         logger.warning(f"Disconnected from MQTT broker: {reason_code}")
+        self._schedule_reconnect()
     
     def _on_message(self, client, userdata, msg):
-        """Callback when a message is received."""
+        """Dispatch a received message to every handler whose filter matches its topic."""
+        for topic, (handler, _) in self._handlers.items():
+            if mqtt.topic_matches_sub(topic, msg.topic):
+                # Contain handler failures so one bad payload can't break the shared client
+                try:
+                    handler(client, userdata, msg)
+                except Exception:
+                    logger.exception(f"Error handling MQTT message on {msg.topic}")
+    
+    def _on_socket_open(self, client, userdata, sock):
+        """Start watching a new broker socket for incoming data."""
+        self._loop.add_reader(sock, client.loop_read)
+        # A socket dropped before CONNACK can leave a tick chain behind; replace it
+        if self._misc_handle is not None:
+            self._misc_handle.cancel()
+        self._misc_handle = self._loop.call_later(self.MISC_INTERVAL, self._misc_tick)
+    
+    def _on_socket_close(self, client, userdata, sock):
+        """Stop watching a closed broker socket."""
+        self._loop.remove_reader(sock)
+        if self._misc_handle is not None:
+            self._misc_handle.cancel()
+            self._misc_handle = None
+    
+    def _on_socket_register_write(self, client, userdata, sock):
+        """Flush outgoing packets once the socket is writable."""
+        self._loop.add_writer(sock, client.loop_write)
+    
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        """Stop waiting for writability once paho's send queue is empty."""
+        self._loop.remove_writer(sock)
+    
+    def _misc_tick(self):
+        """Run paho's periodic housekeeping and reschedule while connected."""
+        if self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            self._misc_handle = self._loop.call_later(self.MISC_INTERVAL, self._misc_tick)
+    
+    def _schedule_reconnect(self):
+        """Schedule a reconnect attempt, backing off exponentially between attempts."""
+        delay = self._reconnect_delay
+        self._reconnect_delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+        logger.info(f"Reconnecting to MQTT broker in {delay:.0f} seconds")
+        self._reconnect_handle = self._loop.call_later(delay, self._reconnect)
+    
+    def _reconnect(self):
+        """Try to re-establish the broker connection, retrying until it succeeds."""
+        self._reconnect_handle = None
+        if self._stopping or self.connected:
+            return
+        
         try:
-            payload = json.loads(msg.payload.decode())
-            self.battery_state = payload
-            
-            charge_level = payload.get('charge_state', 0)
-            ev_range = payload.get('ev_range_mi', 0)
-            plug_state = payload.get('ev_plug_state', False)
-            charge_state = payload.get('ev_charge_state', False)
-            temp = payload.get('ambient_air_temperature_f', 0)
-            
-            # Create a nice formatted battery status
-            plug_icon = "🔌" if plug_state else "🔋"
-            charge_icon = "⚡" if charge_state else "🛑"
-            
-            logger.info(f"{plug_icon} Battery: {charge_level}% | Range: {ev_range:.1f} mi | "
-                       f"Temp: {temp}°F | {charge_icon} {'Charging' if charge_state else 'Not Charging'}")
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing MQTT message: {e}")
+            self.client.reconnect()
+        except OSError as e:
+            logger.error(f"Error reconnecting to MQTT broker: {e}")
+            self._schedule_reconnect()
     
-    def connect(self):
+    async def connect(self) -> bool:
         """Connect to MQTT broker."""
+        self._loop = asyncio.get_running_loop()
+        self._connected_event = asyncio.Event()
+        self._stopping = False
+        
         try:
+            # Opens the socket and queues CONNECT; the loop handles the rest
             self.client.connect(self.mqtt_host, self.mqtt_port, 60)
-            self.client.loop_start()
-            
-            # Wait for connection
-            timeout = 10
-            start_time = time.time()
-            while not self.connected and (time.time() - start_time) < timeout:
-                time.sleep(0.1)
-            
-            if not self.connected:
-                logger.error("Failed to connect to MQTT broker within timeout")
-                return False
             
+            # Wait for CONNACK
+            await asyncio.wait_for(self._connected_event.wait(), timeout=10)
             return True
             
+        except asyncio.TimeoutError:
+            logger.error("Failed to connect to MQTT broker within timeout")
+            return False
         except Exception as e:
             logger.error(f"Error connecting to MQTT broker: {e}")
             return False
     
     def disconnect(self):
         """Disconnect from MQTT broker."""
-        self.client.loop_stop()
+        self._stopping = True
+        if self._reconnect_handle is not None:
+            self._reconnect_handle.cancel()
+            self._reconnect_handle = None
         self.client.disconnect()
+        # Flush DISCONNECT now; the event loop may not get another turn
+        self.client.loop_write()
+
+
+class EVBatteryMonitor:
+    """Monitors EV battery status via MQTT."""
+    
+    def __init__(self, bus: MqttBus, vehicle_vin: str, payload_format: Literal['json', 'cbor'] = 'json'):
+        self.bus = bus
+        self.vehicle_vin = vehicle_vin
+        
+        # Telemetry payload decoder
+        if payload_format == 'json':
+            self._decode = json_loads
+        elif payload_format == 'cbor':
+            if cbor2 is None:
+                raise ImportError("cbor2 is required for CBOR payloads: pip install cbor2")
+            self._decode = cbor2.loads
+        else:
+            raise ValueError(f"Unsupported payload format: {payload_format}")
+        self.battery_state: Dict[str, Any] = {}
+        self._last_payload: bytes = b""
+        # Created in wait_for_first_message() so it binds to the running event loop
+        self._first_message: Optional[asyncio.Event] = None
+        
+        # Battery state topic
+        battery_topic = f"homeassistant/sensor/{self.vehicle_vin}/high_voltage_battery/state"
+        self.bus.subscribe(battery_topic, self._on_message)
+    
+    def _on_message(self, client, userdata, msg):
+        """Callback when a message is received."""
+        # Idle heartbeats repeat the same payload - nothing new to parse
+        if msg.payload == self._last_payload:
+            return
+        
+        try:
+            payload = self._decode(msg.payload)
+            if not isinstance(payload, dict):
+                logger.error("Unexpected battery payload type: %s", type(payload).__name__)
+                return
+            self.battery_state.update(payload)
+            self._last_payload = msg.payload
+            if self._first_message is not None:
+                self._first_message.set()
+            
+            # The status line is the only consumer of these fields - skip it all when INFO is off
+            if logger.isEnabledFor(logging.INFO):
+                state = self.battery_state
+                charge_level = state.get('charge_state', 0)
+                ev_range = state.get('ev_range_mi', 0)
+                plug_state = state.get('ev_plug_state', False)
+                charge_state = state.get('ev_charge_state', False)
+                temp = state.get('ambient_air_temperature_f', 0)
+                
+                # Create a nice formatted battery status
+                plug_icon = "🔌" if plug_state else "🔋"
+                charge_icon = "⚡" if charge_state else "🛑"
+                
+                logger.info(_BATTERY_LOG_FMT, plug_icon, charge_level, ev_range, temp,
+                            charge_icon, 'Charging' if charge_state else 'Not Charging')
+            
+        except ValueError as e:
+            # JSONDecodeError and CBORDecodeError are both ValueErrors
+            logger.error("Error parsing MQTT message: %s", e)
+    
+    async def wait_for_first_message(self, timeout: float) -> bool:
+        """
+        Wait until the first battery state message has been parsed.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            bool: True if battery state arrived, False on timeout
+        """
+        # Battery state may already have arrived while connecting
+        if self._last_payload:
+            return True
+        
+        self._first_message = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._first_message.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
     
     def get_charge_level(self) -> Optional[int]:
         """Get current battery charge level percentage."""
@@ -226,13 +449,20 @@ class EVBatteryMonitor:
         command_topic = f"homeassistant/sensor/{self.vehicle_vin}/charge_override/command"
         command = "START" if start_charging else "STOP"
         
-        self.client.publish(command_topic, command)
+        # Fire-and-forget: QoS 0 never waits on a broker ack
+        info = self.bus.publish(command_topic, command, qos=0, retain=False)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            logger.error(f"Failed to publish charge command {command}: {mqtt.error_string(info.rc)}")
+            return
         logger.info(f"Published charge command: {command} to {command_topic}")
 
 
 class SMSNotifier:
     """Sends SMS notifications via email-to-SMS gateway."""
     
+    # Socket timeout in seconds, so a half-open idle connection can't hang NOOP or send
+    SMTP_TIMEOUT = 20
+    
     def __init__(self, smtp_server: str, smtp_port: int, email: str, password: str, 
                  phone_number: str, carrier_gateway: str):
         self.smtp_server = smtp_server
@@ -240,27 +470,57 @@ class SMSNotifier:
         self.email = email
         self.password = password
         self.sms_address = f"{phone_number}@{carrier_gateway}"
+        
+        # SMTP connection kept open across notifications, opened on first use
+        self._smtp: Optional[smtplib.SMTP] = None
+    
+    def _ensure(self) -> smtplib.SMTP:
+        """Return a live SMTP connection, reconnecting if the previous one dropped."""
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.SMTP_TIMEOUT)
+        try:
+            server.starttls()
+            server.login(self.email, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
     
     def send_notification(self, message: str):
         """Send SMS notification."""
         try:
-            import smtplib
-            from email.mime.text import MIMEText
-            
             msg = MIMEText(message)
             msg['Subject'] = 'EV Charging Alert'
             msg['From'] = self.email
             msg['To'] = self.sms_address
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email, self.password)
-                server.send_message(msg)
+            try:
+                self._ensure().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped us between the NOOP and the send - retry once
+                self.close()
+                self._ensure().send_message(msg)
             
             # Logging is now handled in the notify() method
             
         except Exception as e:
             logger.error(f"Error sending SMS: {e}")
+    
+    def close(self):
+        """Close the SMTP connection if one is open."""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
 
 
 class SmartEVChargingController:
@@ -271,10 +531,14 @@ class SmartEVChargingController:
         
         # Initialize components
         self.price_checker = ComEdPriceChecker(config['COMED_API_KEY'])
-        self.battery_monitor = EVBatteryMonitor(
+        self.mqtt_bus = MqttBus(
             mqtt_host=config['MQTT_HOST'],
-            mqtt_port=config['MQTT_PORT'],
-            vehicle_vin=config['VEHICLE_VIN']
+            mqtt_port=config['MQTT_PORT']
+        )
+        self.battery_monitor = EVBatteryMonitor(
+            bus=self.mqtt_bus,
+            vehicle_vin=config['VEHICLE_VIN'],
+            payload_format=config.get('PAYLOAD_FORMAT', 'json')
         )
         
         # Initialize SMS notifier if credentials provided
@@ -297,10 +561,11 @@ class SmartEVChargingController:
         
         self.currently_charging = False
     
-    def notify(self, message: str):
+    async def notify(self, message: str):
         """Send notification if SMS is configured."""
         if self.sms_notifier:
-            self.sms_notifier.send_notification(message)
+            # SMTP is blocking; keep it off the event loop so MQTT I/O keeps flowing
+            await asyncio.to_thread(self.sms_notifier.send_notification, message)
             logger.info(f"📱 SMS sent: {message}")
         # Don't log if SMS is not configured - avoids misleading "Notification:" logs
     
@@ -317,27 +582,29 @@ class SmartEVChargingController:
         """
         # Don't charge if battery is full enough
         if charge_level >= self.max_charge_level:
-            logger.info(f"🔋 Battery sufficient: {charge_level}% (>= {self.max_charge_level}%) → No charging needed")
+            logger.info("🔋 Battery sufficient: %s%% (>= %s%%) → No charging needed",
+                        charge_level, self.max_charge_level)
             return False
         
         # Always charge if battery is critically low
         if charge_level < self.min_charge_level:
-            logger.warning(f"🚨 EMERGENCY: Battery low {charge_level}% (< {self.min_charge_level}%) → Force charging!")
+            logger.warning("🚨 EMERGENCY: Battery low %s%% (< %s%%) → Force charging!",
+                           charge_level, self.min_charge_level)
             return True
         
         # Charge if price is below threshold
         if current_price <= self.charge_threshold:
-            logger.info(f"💚 Good price: {current_price}¢ <= {self.charge_threshold}¢ → Ready to charge")
+            logger.info("💚 Good price: %s¢ <= %s¢ → Ready to charge", current_price, self.charge_threshold)
             return True
         
-        logger.info(f"💸 Price too high: {current_price}¢ > {self.charge_threshold}¢ → Wait for better price")
+        logger.info("💸 Price too high: %s¢ > %s¢ → Wait for better price", current_price, self.charge_threshold)
         return False
     
-    def control_charging(self):
+    async def control_charging_async(self):
         """Main control loop - check price and manage charging."""
         
         # Get current price
-        current_price = self.price_checker.get_current_price()
+        current_price = await self.price_checker.get_current_price()
         if current_price is None:
             logger.error("Could not get current price - skipping this cycle")
             return
@@ -353,7 +620,7 @@ class SmartEVChargingController:
             logger.info("Vehicle not plugged in - no action needed")
             if self.currently_charging:
                 self.currently_charging = False
-                self.notify(f"Vehicle unplugged. Battery: {charge_level}%")
+                await self.notify(f"Vehicle unplugged. Battery: {charge_level}%")
             return
         
         # Determine if we should charge
@@ -362,31 +629,32 @@ class SmartEVChargingController:
         
         # Take action if state needs to change
         if should_charge and not is_charging:
-            print("\n" + "─"*80)
-            logger.info(f"⚡ STARTING CHARGE | Price: {current_price}¢/kWh | Battery: {charge_level}%")
-            print("─"*80 + "\n")
+            sys.stdout.write("\n" + _DASH80 + "\n")
+            logger.info("⚡ STARTING CHARGE | Price: %s¢/kWh | Battery: %s%%", current_price, charge_level)
+            sys.stdout.write(_DASH80 + "\n\n")
             self.battery_monitor.publish_charge_command(start_charging=True)
             self.currently_charging = True
-            self.notify(f"⚡ Charging STARTED\nPrice: {current_price}¢/kWh\nBattery: {charge_level}%")
+            await self.notify(f"⚡ Charging STARTED\nPrice: {current_price}¢/kWh\nBattery: {charge_level}%")
             
         elif not should_charge and is_charging:
-            print("\n" + "─"*80)
-            logger.info(f"🛑 STOPPING CHARGE | Price: {current_price}¢/kWh | Battery: {charge_level}%")
-            print("─"*80 + "\n")
+            sys.stdout.write("\n" + _DASH80 + "\n")
+            logger.info("🛑 STOPPING CHARGE | Price: %s¢/kWh | Battery: %s%%", current_price, charge_level)
+            sys.stdout.write(_DASH80 + "\n\n")
             self.battery_monitor.publish_charge_command(start_charging=False)
             self.currently_charging = False
-            self.notify(f"🛑 Charging STOPPED\nPrice: {current_price}¢/kWh\nBattery: {charge_level}%")
+            await self.notify(f"🛑 Charging STOPPED\nPrice: {current_price}¢/kWh\nBattery: {charge_level}%")
         
         else:
             status = "⚡ Charging" if is_charging else "🛑 Not Charging"
-            logger.info(f"✓ No change needed | {status} | Price: {current_price}¢/kWh | Battery: {charge_level}%")
+            logger.info("✓ No change needed | %s | Price: %s¢/kWh | Battery: %s%%",
+                        status, current_price, charge_level)
     
     def run(self):
         """Run the smart charging controller."""
         # Print startup banner
-        print("\n" + "="*80)
+        sys.stdout.write("\n" + _EQ80 + "\n")
         print("🚗⚡ SMART EV CHARGING CONTROLLER ⚡🚗".center(80))
-        print("="*80)
+        sys.stdout.write(_EQ80 + "\n")
         
         logger.info("Monitoring pricing and battery status to determine optimal charging")
         logger.info(f"💰 Charge threshold: {self.charge_threshold} cents/kWh")
@@ -394,16 +662,25 @@ class SmartEVChargingController:
         logger.info(f"⏱️  Check interval: {self.check_interval} seconds")
         logger.info(f"🚙 Vehicle VIN: {self.battery_monitor.vehicle_vin}")
         
-        print("="*80 + "\n")
+        sys.stdout.write(_EQ80 + "\n\n")
         
+        try:
+            asyncio.run(self._run_async())
+        except KeyboardInterrupt:
+            # Shutdown is logged and cleaned up inside _run_async
+            pass
+    
+    async def _run_async(self):
+        """Connect to MQTT and run the control loop on the event loop."""
         # Connect to MQTT
-        if not self.battery_monitor.connect():
+        if not await self.mqtt_bus.connect():
             logger.error("Failed to connect to MQTT broker - exiting")
             return
         
         try:
-            # Wait a moment for initial battery state
-            time.sleep(2)
+            # Wait for initial battery state
+            if not await self.battery_monitor.wait_for_first_message(10):
+                logger.warning("No battery state received within 10 seconds - continuing anyway")
             
             # Don't send startup notification - only notify on actual charging decisions
             charge_level = self.battery_monitor.get_charge_level()
@@ -413,21 +690,25 @@ class SmartEVChargingController:
             # Main control loop
             while True:
                 try:
-                    print("\n" + "┄"*80)
+                    sys.stdout.write("\n" + _DOT80 + "\n")
                     logger.info(f"🔄 Running check cycle...")
-                    self.control_charging()
+                    await self.control_charging_async()
                     logger.info(f"⏰ Next check in {self.check_interval} seconds")
-                    print("┄"*80 + "\n")
+                    sys.stdout.write(_DOT80 + "\n\n")
                 except Exception as e:
                     logger.error(f"Error in control loop: {e}", exc_info=True)
                 
                 # Wait for next check
-                time.sleep(self.check_interval)
+                await asyncio.sleep(self.check_interval)
                 
-        except KeyboardInterrupt:
+        except asyncio.CancelledError:
             logger.info("Shutting down...")
+            raise
         finally:
-            self.battery_monitor.disconnect()
+            self.mqtt_bus.disconnect()
+            await self.price_checker.aclose()
+            if self.sms_notifier:
+                self.sms_notifier.close()
             logger.info("Disconnected from MQTT broker")
 
 
@@ -440,6 +721,7 @@ def main():
         'MQTT_HOST': os.getenv('MQTT_HOST', 'mosquitto'),
         'MQTT_PORT': int(os.getenv('MQTT_PORT', '1883')),
         'VEHICLE_VIN': os.getenv('VEHICLE_VIN', 'your-vin'),
+        'PAYLOAD_FORMAT': os.getenv('PAYLOAD_FORMAT', 'json').strip().lower(),  # json or cbor
         'CHARGE_PRICE_THRESHOLD_CENTS': float(os.getenv('CHARGE_PRICE_THRESHOLD_CENTS', '3.0')),
         'MIN_CHARGE_LEVEL': int(os.getenv('MIN_CHARGE_LEVEL', '20')),
         'MAX_CHARGE_LEVEL': int(os.getenv('MAX_CHARGE_LEVEL', '90')),
@@ -459,6 +741,14 @@ def main():
         logger.error("VEHICLE_VIN environment variable is required")
         return
     
+    if config['PAYLOAD_FORMAT'] not in ('json', 'cbor'):
+        logger.error(f"PAYLOAD_FORMAT must be 'json' or 'cbor', got: {config['PAYLOAD_FORMAT']}")
+        return
+    
+    if config['PAYLOAD_FORMAT'] == 'cbor' and cbor2 is None:
+        logger.error("PAYLOAD_FORMAT=cbor requires the cbor2 package (pip install cbor2)")
+        return
+    
     # Create and run controller
     controller = SmartEVChargingController(config)
     controller.run()
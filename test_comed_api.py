@@ -5,13 +5,29 @@ This script helps verify you can fetch pricing data from ComEd.
 
 import requests
 import json
+import numpy as np
 from datetime import datetime
 
+from pricing import INDICATORS, price_level
+
+# Console separator lines
+_EQ80 = "=" * 80
+_RULE80 = "-" * 80
+
+# Charging advice for each price level in pricing.INDICATORS
+ADVICE = (
+    "Great time to charge!",
+    "Reasonable charging price",
+    "Consider waiting if not urgent",
+    "Avoid charging unless necessary",
+    "Definitely avoid charging!",
+)
+
 def test_comed_api():
     """Test ComEd hourly pricing API."""
     
     print("🧪 ComEd Pricing API Test")
-    print("="*80)
+    print(_EQ80)
     print()
     
     try:
@@ -20,19 +36,20 @@ def test_comed_api():
         print(f"📡 Fetching data from: {url}")
         print()
         
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
+        with requests.Session() as session:
+            response = session.get(url, timeout=(3.05, 10))
+            response.raise_for_status()
+            
+            data = response.json()
         
         print(f"✅ Successfully fetched data!")
         print(f"📊 Number of price points: {len(data)}")
-        print("="*80)
+        print(_EQ80)
         print()
         
         # Display the most recent prices
         print("💰 MOST RECENT PRICES:")
-        print("-"*80)
+        print(_RULE80)
         
         for i, entry in enumerate(data[:5]):  # Show first 5 entries
             milliseconds = int(entry.get('millisUTC', 0))
@@ -46,45 +63,39 @@ def test_comed_api():
             print(f"  Price: {price:.2f} ¢/kWh")
             
             # Add pricing advice
-            if price <= 3.0:
-                print(f"  💚 EXCELLENT - Great time to charge!")
-            elif price <= 5.0:
-                print(f"  🟢 GOOD - Reasonable charging price")
-            elif price <= 8.0:
-                print(f"  🟡 MODERATE - Consider waiting if not urgent")
-            elif price <= 12.0:
-                print(f"  🟠 HIGH - Avoid charging unless necessary")
-            else:
-                print(f"  🔴 VERY HIGH - Definitely avoid charging!")
+            level = price_level(price)
+            print(f"  {INDICATORS[level]} - {ADVICE[level]}")
         
-        print("\n" + "="*80)
+        print("\n" + _EQ80)
         print()
         
         # Calculate statistics
-        prices = [float(entry.get('price', 0)) for entry in data]
-        avg_price = sum(prices) / len(prices) if prices else 0
-        min_price = min(prices) if prices else 0
-        max_price = max(prices) if prices else 0
+        prices = np.fromiter((float(entry.get('price', 0)) for entry in data),
+                             dtype=np.float64, count=len(data))
+        if prices.size:
+            avg_price, min_price, max_price = float(prices.mean()), float(prices.min()), float(prices.max())
+        else:
+            avg_price = min_price = max_price = 0
         
         print("📈 PRICE STATISTICS (Recent period):")
-        print("-"*80)
+        print(_RULE80)
         print(f"  Average: {avg_price:.2f} ¢/kWh")
         print(f"  Minimum: {min_price:.2f} ¢/kWh")
         print(f"  Maximum: {max_price:.2f} ¢/kWh")
         print()
         
         # Show raw JSON of first entry
-        print("="*80)
+        print(_EQ80)
         print("📋 RAW DATA (First Entry):")
-        print("-"*80)
+        print(_RULE80)
         print(json.dumps(data[0], indent=2))
         print()
         
         # Recommendations
-        current_price = prices[0] if prices else 0
-        print("="*80)
+        current_price = float(prices[0]) if prices.size else 0
+        print(_EQ80)
         print("💡 RECOMMENDATIONS:")
-        print("-"*80)
+        print(_RULE80)
         print(f"  Current Price: {current_price:.2f} ¢/kWh")
         print()
         
@@ -129,12 +140,12 @@ def main():
     """Run the test."""
     success = test_comed_api()
     
-    print("="*80)
+    print(_EQ80)
     if success:
         print("✅ TEST PASSED - ComEd API is working!")
     else:
         print("❌ TEST FAILED - Please check the errors above")
-    print("="*80)
+    print(_EQ80)
 
 if __name__ == "__main__":
     main()
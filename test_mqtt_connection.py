@@ -7,6 +7,12 @@ import json
 import time
 import paho.mqtt.client as mqtt
 
+# Use orjson when available, otherwise fall back to the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 MQTT_HOST = "mosquitto"  # Change to "localhost" if running outside Docker
 MQTT_PORT = 1883
@@ -17,9 +23,14 @@ def on_connect(client, userdata, flags, reason_code, properties):
     print(f"✅ Connected to MQTT broker with result code: {reason_code}")
     print("="*80)
     
-    # Subscribe to all homeassistant topics
-    client.subscribe("homeassistant/#")
-    print("📡 Subscribed to: homeassistant/#")
+    # Subscribe only to the vehicle topics the controller uses
+    topics = [
+        (f"homeassistant/sensor/{VEHICLE_VIN}/high_voltage_battery/state", 0),
+        (f"homeassistant/sensor/{VEHICLE_VIN}/charge_override/state", 0),
+    ]
+    client.subscribe(topics)
+    for topic, _ in topics:
+        print(f"📡 Subscribed to: {topic}")
     print("Waiting for messages...\n")
 
 def on_message(client, userdata, msg):
@@ -29,9 +40,14 @@ def on_message(client, userdata, msg):
     
     try:
         # Try to parse as JSON and pretty print
-        payload = json.loads(msg.payload.decode())
+        if orjson is not None:
+            payload = orjson.loads(msg.payload)
+            formatted = orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+        else:
+            payload = json.loads(msg.payload)
+            formatted = json.dumps(payload, indent=2)
         print("Payload (formatted):")
-        print(json.dumps(payload, indent=2))
+        print(formatted)
         
         # If this is battery data, highlight key info
         if "high_voltage_battery" in msg.topic: